@@ -1,21 +1,35 @@
 """
 Duplicate Image Evaluation
 
-This module scans a root folder for images, skipping folders that match any keyword in a skiplist.
+This module scans a root folder for images, skipping folders (and everything below them) that match any keyword in a
+skiplist.
 It evaluates images per folder, splitting them into two groups based on a size threshold (default 800 KB).
 
-For each folder, it calculates a perceptual hash (phash) for every image (resized to PHASH_SIZE x PHASH_SIZE),
-then compares phashes between the big and small groups.
+For each folder, it calculates a perceptual hash (phash) for every image, then compares phashes between the big
+and small groups. Phashes are computed in parallel over a pool of worker processes, one per CPU core, and cached in a
+SQLite file so images that did not change (same size and modification time) are not hashed again on the next run.
 
 If two images are visually similar (phash distance <= 5), they are marked as duplicates,
 with the smaller one flagged as the dupe. Results are exported to a CSV file for further review or processing.
 """
 
 import os
-import pandas as pd
+import sqlite3
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+import numpy as np
 from PIL import Image
-import imagehash
-from src.utils import should_skip_by_partial_match
+from scipy.fft import dct
+from src.utils import should_skip_by_partial_match, walk_entries, write_csv
+
+try:
+    import cv2
+except ImportError:  # OpenCV is optional, phashes fall back to Pillow + scipy
+    cv2 = None
+
+# OpenCV and Pillow hashes of the same image differ by a few bits, the cache only reuses hashes from the same backend
+PHASH_BACKEND = 'opencv' if cv2 is not None else 'pillow'
 
 # Configuration
 # Root folder to start crawling for images
@@ -24,63 +38,175 @@ ROOT_PICTURES_FOLDER = r"D:\pictures" # "data/with_dupes"
 SKIPLIST_PARTIAL_MATCH = ["Trash", "small", "large", "collages", "iphone_import", "LRCatalog"]
 # Size threshold in bytes to separate images into big/small groups (800 KB)
 SIZE_THRESHOLD_BYTES = 800 * 1024  # 800 KB
-# Size for phash calculation (images will be resized to PHASH_SIZE x PHASH_SIZE)
-PHASH_SIZE = 64
 # Output folder for the CSV report
 OUTPUT_CSV_FOLDER_PATH = "report"
+# SQLite file caching phashes between runs, keyed on file path + size + modification time + phash backend
+# (None disables the cache)
+PHASH_CACHE_FILE_PATH = "report/phash_cache.sqlite"
 # Output CSV file name
 OUTPUT_CSV_FILE_NAME = "duplicate_image_report.csv"
 # define CSV separator symbol
 CSV_SEPARATOR=";"
+# Print every folder that is processed or skipped, otherwise only print progress every PROGRESS_EVERY_N_FOLDERS folders
+VERBOSE = False
+PROGRESS_EVERY_N_FOLDERS = 100
+
+def pack_phash(bits):
+    # Pack the 8x8 boolean hash into one 64-bit int, first bit most significant (bit order of the imagehash hex string)
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def format_phash(phash):
+    return format(phash, '016x')
+
+
+def get_image_phash_cv2(image_path, hash_size=8):
+    # Follows imagehash.phash's steps: grayscale, downsample to (4 * hash_size)^2, keep the low frequency corner
+    # of the DCT and threshold it on its median. OpenCV does the decode, resize and DCT in C, with area resampling
+    # and an orthonormal DCT, so the hashes differ by a few bits from the Pillow path below.
+    try:
+        # imdecode instead of imread, imread can't open non-ASCII paths on Windows
+        img = cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+    except Exception:
+        return None, None
+    if img is None:
+        return None, None
+    height, width = img.shape
+    img_size = hash_size * 4
+    img = cv2.resize(img, (img_size, img_size), interpolation=cv2.INTER_AREA)
+    lowfreq = cv2.dct(np.float32(img))[:hash_size, :hash_size]
+    return pack_phash(lowfreq > np.median(lowfreq)), (width, height)
 
-# Ensure pandas prints all columns and rows
-pd.set_option('display.max_columns', None)
-pd.set_option('display.width', None)
-pd.set_option('display.max_colwidth', None)
-pd.set_option('display.max_rows', None)
 
 def get_image_phash(image_path, hash_size=8):
+    # Returns (phash packed into an int, (width, height)), or (None, None) if the image can't be read.
+    # hash_size must stay 8 so the phash fits the uint64 comparison.
+    if cv2 is not None:
+        phash, dimensions = get_image_phash_cv2(image_path, hash_size)
+        if phash is not None:
+            return phash, dimensions
+    # Pillow path, used without OpenCV or for files OpenCV can't decode.
+    # Follows imagehash.phash's steps on a draft-decoded image, which is faster to decode but gives different
+    # pixels, so the hashes are not the same as imagehash produced for the full image.
     try:
         with Image.open(image_path) as img:
-            img = img.convert("RGB")
-            img = img.resize((PHASH_SIZE, PHASH_SIZE))
-            return str(imagehash.phash(img, hash_size=hash_size))
+            dimensions = img.size
+            # Let libjpeg decode straight to grayscale and downscale (1/2, 1/4, 1/8), no-op for other formats
+            img.draft('L', (64, 64))
+            # phash only looks at luminance, convert is a no-op when draft already gave us L
+            img_size = hash_size * 4
+            pixels = np.asarray(img.convert('L').resize((img_size, img_size), Image.Resampling.LANCZOS),
+                                dtype=np.float32)
     except Exception:
-        return None
+        return None, None
+    lowfreq = dct(dct(pixels, axis=0), axis=1)[:hash_size, :hash_size]
+    return pack_phash(lowfreq > np.median(lowfreq)), dimensions
 
 
-def evaluate_folder(folder_path, filenames):
+def load_phash_cache(cache_path):
+    # Returns {path: (size, mtime, phash hex or None, width, height)} as stored by previous runs with the same
+    # PHASH_BACKEND, hashes from the other backend count as not cached
+    if not cache_path or not os.path.exists(cache_path):
+        return {}
+    with closing(sqlite3.connect(cache_path)) as connection, connection:
+        try:
+            rows = connection.execute('SELECT path, size, mtime, phash, width, height FROM phash WHERE backend = ?',
+                                      (PHASH_BACKEND,)).fetchall()
+        except sqlite3.OperationalError:
+            # Missing table, or a cache written before image dimensions and backends were stored: start over
+            connection.execute('DROP TABLE IF EXISTS phash')
+            return {}
+    return {row[0]: row[1:] for row in rows}
+
+
+def save_phash_cache(cache_path, rows):
+    if not cache_path or not rows:
+        return
+    os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+    with closing(sqlite3.connect(cache_path)) as connection, connection:
+        connection.execute('CREATE TABLE IF NOT EXISTS phash '
+                           '(path TEXT PRIMARY KEY, size INTEGER, mtime REAL, phash TEXT, width INTEGER, height INTEGER, '
+                           'backend TEXT)')
+        connection.executemany('INSERT OR REPLACE INTO phash VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+
+
+def aspect_ratio_key(dimensions):
+    # Aspect ratio in percent, a resized copy keeps the ratio of its original up to rounding
+    width, height = dimensions
+    return round(100 * width / height)
+
+
+def evaluate_folder(file_entries, executor, phash_cache, new_cache_rows):
     results = []
     big_imgs = []
     small_imgs = []
-    for file_name in filenames:
-        file_path = os.path.join(folder_path, file_name)
+    entries = []
+    to_hash = []
+    dimensions = {}
+    for file_entry in file_entries:
         try:
-            size = os.path.getsize(file_path)
+            stat = file_entry.stat()
         except Exception:
             continue
         entry = {
-            'file': file_path,
-            'size': size,
+            'file': file_entry.path,
+            'size': stat.st_size,
             'phash': None,
             'dupe_type': '',
             'dupe_of': ''
         }
-        phash = get_image_phash(file_path)
+        entries.append(entry)
+        cached = phash_cache.get(entry['file'])
+        if cached is not None and cached[0] == stat.st_size and cached[1] == stat.st_mtime:
+            # Unchanged since the previous run, reuse its phash (None if the image could not be read back then)
+            if cached[2]:
+                entry['phash'] = int(cached[2], 16)
+                dimensions[entry['file']] = cached[3:]
+        else:
+            to_hash.append((entry, stat.st_mtime))
+    # Hashing is CPU bound (decode + DCT), so spread it over the worker processes
+    phashes = executor.map(get_image_phash, [entry['file'] for entry, _ in to_hash], chunksize=8)
+    for (entry, mtime), (phash, image_dimensions) in zip(to_hash, phashes):
         entry['phash'] = phash
-        if size >= SIZE_THRESHOLD_BYTES:
+        if phash is not None:
+            dimensions[entry['file']] = image_dimensions
+            new_cache_rows.append((entry['file'], entry['size'], mtime, format_phash(phash), *image_dimensions,
+                                   PHASH_BACKEND))
+        else:
+            new_cache_rows.append((entry['file'], entry['size'], mtime, None, None, None, PHASH_BACKEND))
+    for entry in entries:
+        if entry['size'] >= SIZE_THRESHOLD_BYTES:
             big_imgs.append(entry)
         else:
             small_imgs.append(entry)
-    # Compare phashes between big and small
-    for big in big_imgs:
-        for small in small_imgs:
-            if big['phash'] and small['phash']:
-                # Hamming distance threshold for phash similarity
-                if imagehash.hex_to_hash(big['phash']) - imagehash.hex_to_hash(small['phash']) <= 5:
-                    big['dupe_type'] = 'dupe_big'
-                    small['dupe_type'] = 'dupe_small'
-                    small['dupe_of'] = big['file']
+    # Compare phashes between big and small. A small dupe is a resized copy of a big image, so only images
+    # with the same aspect ratio (give or take a percent of rounding) are compared, all pairs of a ratio at once
+    hashed_big = [e for e in big_imgs if e['phash'] is not None]
+    hashed_small = [e for e in small_imgs if e['phash'] is not None]
+    big_by_ratio = defaultdict(list)
+    for i, e in enumerate(hashed_big):
+        big_by_ratio[aspect_ratio_key(dimensions[e['file']])].append(i)
+    small_by_ratio = defaultdict(list)
+    for i, e in enumerate(hashed_small):
+        small_by_ratio[aspect_ratio_key(dimensions[e['file']])].append(i)
+    matches = []
+    for ratio, big_indices in big_by_ratio.items():
+        small_indices = [s for r in (ratio - 1, ratio, ratio + 1) for s in small_by_ratio.get(r, ())]
+        if not small_indices:
+            continue
+        big_hashes = np.array([hashed_big[b]['phash'] for b in big_indices], dtype=np.uint64)
+        small_hashes = np.array([hashed_small[s]['phash'] for s in small_indices], dtype=np.uint64)
+        # Hamming distance is the number of set bits in the xor of both hashes (a single POPCNT per pair)
+        distances = np.bitwise_count(big_hashes[:, None] ^ small_hashes[None, :])
+        # Hamming distance threshold for phash similarity
+        for b, s in np.argwhere(distances <= 5):
+            matches.append((big_indices[b], small_indices[s]))
+    # Apply in big-then-small order, so a small image matching several big ones ends up with the last one
+    for b, s in sorted(matches):
+        big, small = hashed_big[b], hashed_small[s]
+        big['dupe_type'] = 'dupe_big'
+        small['dupe_type'] = 'dupe_small'
+        small['dupe_of'] = big['file']
     results.extend(big_imgs)
     results.extend(small_imgs)
     return results
@@ -88,27 +214,53 @@ def evaluate_folder(folder_path, filenames):
 
 def crawl_and_evaluate(root_folder, skiplist):
     all_results = []
-    for folder_path, dirnames, filenames in os.walk(root_folder):
-        if should_skip_by_partial_match(folder_path, skiplist):
-            print(f"Skipping folder: {folder_path}")  # Progress print
-            continue
-        print(f"Processing folder: {folder_path}")  # Progress print
-        # Only process folders with images
-        image_files = [f for f in filenames if f.lower().endswith((".jpg", ".jpeg", ".png"))]
-        if not image_files:
-            continue
-        folder_results = evaluate_folder(folder_path, image_files)
-        all_results.extend(folder_results)
+    folder_count = 0
+    phash_cache = load_phash_cache(PHASH_CACHE_FILE_PATH)
+    new_cache_rows = []
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for folder_path, dirnames, file_entries in walk_entries(root_folder):
+            folder_count += 1
+            if not VERBOSE and folder_count % PROGRESS_EVERY_N_FOLDERS == 0:
+                print(f"Crawled {folder_count} folders...")  # Progress print
+            if should_skip_by_partial_match(folder_path, skiplist):
+                # Only the root folder can get here, matching subfolders are pruned below
+                if VERBOSE:
+                    print(f"Skipping folder: {folder_path}")
+                dirnames[:] = []
+                continue
+            if VERBOSE:
+                print(f"Processing folder: {folder_path}")
+            # Prune skipped subfolders so their whole subtree is never listed
+            kept_dirnames = []
+            for dirname in dirnames:
+                if should_skip_by_partial_match(dirname, skiplist):
+                    if VERBOSE:
+                        print(f"Skipping folder: {os.path.join(folder_path, dirname)}")
+                else:
+                    kept_dirnames.append(dirname)
+            dirnames[:] = kept_dirnames
+            # Only process folders with images
+            image_files = [f for f in file_entries if f.name.lower().endswith((".jpg", ".jpeg", ".png"))]
+            if not image_files:
+                continue
+            folder_results = evaluate_folder(image_files, executor, phash_cache, new_cache_rows)
+            all_results.extend(folder_results)
+    save_phash_cache(PHASH_CACHE_FILE_PATH, new_cache_rows)
     return all_results
 
 
 if __name__ == "__main__":
     results = crawl_and_evaluate(ROOT_PICTURES_FOLDER, SKIPLIST_PARTIAL_MATCH)
-    df = pd.DataFrame(results)
-    print(df[df['dupe_type'].str.startswith('dupe')])
+    for entry in results:
+        if entry['dupe_type'] == 'dupe_small':
+            print(f"{entry['file']} is a duplicate of {entry['dupe_of']}")
 
     # Ensure output folder exists
     os.makedirs(OUTPUT_CSV_FOLDER_PATH, exist_ok=True)
     output_csv_path = os.path.join(OUTPUT_CSV_FOLDER_PATH, OUTPUT_CSV_FILE_NAME)
-    df.to_csv(output_csv_path, sep=CSV_SEPARATOR, index=False)
+    report_columns = ['file', 'size', 'phash', 'dupe_type', 'dupe_of']
+    # phashes are only formatted as hex for the report
+    rows = ((e['file'], e['size'], format_phash(e['phash']) if e['phash'] is not None else '', e['dupe_type'], e['dupe_of'])
+            for e in results)
+    write_csv(output_csv_path, report_columns, rows, CSV_SEPARATOR)
     print(f"Done. Results written to {output_csv_path}")
@@ -21,13 +21,13 @@ Logic Flow:
       - EXIF "DateTimeOriginal" (date taken) metadata is present, OR
       - EXIF date is missing BUT file's modified date year matches the year in folder path
 
-3. Results are collected in a list of dictionaries with:
+3. Results are collected as one row tuple per file, in REPORT_COLUMNS order, with:
    - file: absolute file path
    - action: 'skip' or 'move'
    - reason: detailed explanation of why the action was chosen
 
 4. Results are exported to:
-   - Console output (pandas DataFrame with all columns visible)
+   - Console output (number of files per action)
    - CSV file with '@' as column separator for easy review/editing
 
 Output Actions:
@@ -46,11 +46,12 @@ If no EXIF and file modified in 2019 -> action: 'skip', reason: 'date modified y
 """
 
 import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import pandas as pd
 from PIL import Image
-from PIL.ExifTags import TAGS
-from src.utils import should_skip_by_partial_match, extract_year_from_path
+from PIL.ExifTags import Base, IFD
+from src.utils import should_skip_by_partial_match, extract_year_from_path, walk_entries, write_csv
 
 
 ### CONFIGURATION ###
@@ -66,77 +67,69 @@ OUTPUT_CSV_FOLDER_PATH = "report/2024"
 OUTPUT_CSV_FILE_NAME = "icloud_image_report.csv"
 # define CSV separator symbol
 CSV_SEPARATOR=";"
-
-
-# Pandas display settings
-pd.set_option('display.max_columns', None)
-pd.set_option('display.width', None)
-pd.set_option('display.max_colwidth', None)
+# Print every folder that is crawled
+VERBOSE = False
 
 def get_exif_date_taken(filepath):
     try:
-        image = Image.open(filepath)
-        exif_data = image._getexif()
-        if exif_data:
-            for tag_id, value in exif_data.items():
-                tag = TAGS.get(tag_id, tag_id)
-                if tag == 'DateTimeOriginal':
-                    return value
+        # Only the header is parsed, pixels are never decoded
+        with Image.open(filepath) as image:
+            # DateTimeOriginal lives in the Exif sub-IFD, look it up directly instead of walking all tags
+            return image.getexif().get_ifd(IFD.Exif).get(Base.DateTimeOriginal)
     except Exception:
         pass
     return None
 
+# Column order of the CSV report, evaluate_file returns its row as a tuple in this order
+REPORT_COLUMNS = ['file', 'datetime', 'action', 'reason']
+
+def evaluate_file(file_entry, folder_skipped, image_extensions, skiplist):
+    file_name = file_entry.name
+    file_path = os.path.abspath(file_entry.path)
+
+    ext = os.path.splitext(file_name)[1][1:].lower()
+    if ext not in image_extensions:
+        return file_path, '', 'skip', 'wrong extension'
+
+    # Keywords can't span a path separator, so a file matches if its folder or its own name does
+    if folder_skipped or should_skip_by_partial_match(file_name, skiplist):
+        return file_path, '', 'skip', 'skiplist match'
+
+    date_taken = get_exif_date_taken(file_path)
+    if date_taken:
+        return file_path, date_taken, 'move', 'date taken available'
+
+    path_year = extract_year_from_path(file_path)
+    if path_year:
+        mod_time = file_entry.stat().st_mtime
+        mod_year = datetime.fromtimestamp(mod_time).year
+        if str(mod_year) == path_year:
+            date_modified = datetime.fromtimestamp(mod_time).strftime('%Y:%m:%d %H:%M:%S')
+            return file_path, date_modified, 'move', 'date modified year correct'
+        return file_path, '', 'skip', 'date modified year mismatch'
+    return file_path, '', 'skip', 'no year in path'
+
 def crawl_and_evaluate(root_folder_path, image_extensions, skiplist):
-    results = []
-    for folder_path, _, filenames in os.walk(root_folder_path):
+    file_entries = []
+    for folder_path, _, folder_file_entries in walk_entries(root_folder_path):
         # Print when entering a new folder
-        print(f"Entering folder: {folder_path}")
-        for file_name in filenames:
-            file_path = os.path.abspath(os.path.join(folder_path, file_name))
-            entry = {'file': file_path, 'datetime': ''}
-            results.append(entry)
-
-            ext = os.path.splitext(file_name)[1][1:].lower()
-            if ext not in image_extensions:
-                entry['action'] = 'skip'
-                entry['reason'] = 'wrong extension'
-                continue
-
-            if should_skip_by_partial_match(file_path, skiplist):
-                entry['action'] = 'skip'
-                entry['reason'] = 'skiplist match'
-                continue
-
-            date_taken = get_exif_date_taken(file_path)
-            if date_taken:
-                entry['action'] = 'move'
-                entry['reason'] = 'date taken available'
-                entry['datetime'] = date_taken
-                continue
-
-            path_year = extract_year_from_path(file_path)
-            if path_year:
-                mod_time = os.path.getmtime(file_path)
-                mod_year = datetime.fromtimestamp(mod_time).year
-                if str(mod_year) == path_year:
-                    entry['action'] = 'move'
-                    entry['reason'] = 'date modified year correct'
-                    entry['datetime'] = datetime.fromtimestamp(mod_time).strftime('%Y:%m:%d %H:%M:%S')
-                else:
-                    entry['action'] = 'skip'
-                    entry['reason'] = 'date modified year mismatch'
-            else:
-                entry['action'] = 'skip'
-                entry['reason'] = 'no year in path'
-    return results
+        if VERBOSE:
+            print(f"Entering folder: {folder_path}")
+        # Match the skiplist once per folder rather than against every full file path
+        folder_skipped = should_skip_by_partial_match(os.path.abspath(folder_path), skiplist)
+        file_entries.extend((file_entry, folder_skipped) for file_entry in folder_file_entries)
+    # Evaluation is dominated by file I/O and header parsing, which overlap well on threads
+    with ThreadPoolExecutor(max_workers=2 * (os.cpu_count() or 1)) as executor:
+        return list(executor.map(lambda args: evaluate_file(*args, image_extensions, skiplist), file_entries))
 
 if __name__ == "__main__":
     image_exts = [e.lower() for e in ONLY_HANDLE_THESE_IMAGE_EXTENSIONS]
-    results = crawl_and_evaluate(ROOT_PICTURES_FOLDER, image_exts, SKIPLIST_PARTIAL_MATCH)
-    df = pd.DataFrame(results)
-    print(df)
+    rows = crawl_and_evaluate(ROOT_PICTURES_FOLDER, image_exts, SKIPLIST_PARTIAL_MATCH)
+    action_index = REPORT_COLUMNS.index('action')
+    for action, count in Counter(row[action_index] for row in rows).items():
+        print(f"{action}: {count} files")
 
     # Ensure output folder exists
     os.makedirs(OUTPUT_CSV_FOLDER_PATH, exist_ok=True)
     OUTPUT_CSV_FILE_PATH = os.path.join(OUTPUT_CSV_FOLDER_PATH, OUTPUT_CSV_FILE_NAME)
-    df.to_csv(OUTPUT_CSV_FILE_PATH, sep=CSV_SEPARATOR, index=False)
+    write_csv(OUTPUT_CSV_FILE_PATH, REPORT_COLUMNS, rows, CSV_SEPARATOR)
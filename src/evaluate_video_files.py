@@ -9,12 +9,14 @@ information, then categorizes them accordingly.
 Logic Flow:
 -----------
 1. Recursively crawls a root folder for video files with specified extensions (mkv, mp4, mov)
+   Files are evaluated in parallel on a thread pool so several ffprobe processes run at once
 
 2. For each video file found, applies the following decision tree:
 
    a) SKIP if:
       - File extension doesn't match ONLY_HANDLE_THESE_VIDEO_EXTENSIONS
       - File path contains any keyword from SKIPLIST_PARTIAL_MATCH
+      - File header is not a recognizable MOV/MP4 or MKV container (checked before spawning ffprobe)
       - ffprobe fails to analyze the file
       - No creation date in metadata AND no year (20XX) found in parent folder path
       - No creation date in metadata AND file's modified date year doesn't match folder path year
@@ -29,10 +31,11 @@ Logic Flow:
       - Video has creation date metadata BUT needs format changes:
         * Container not MOV → remux to MOV
         * Video not hvc1 HEVC → re-encode to libx265 with hvc1 tag
+        * Video 8-bit SDR HEVC (yuv420p) but tagged hev1 → copy the video stream, retagged as hvc1
         * Audio not AAC → re-encode to AAC
 
 3. Video Stream Analysis:
-   - Checks if video codec is HEVC with hvc1 tag (required for iCloud thumbnails)
+   - Checks if video codec is HEVC and tagged hvc1 (required for iCloud thumbnails), 8-bit SDR hev1 is retagged by a remux
    - Detects HDR content by checking:
      * Explicit HDR transfer functions (smpte2084, arib-std-b67)
      * Dolby Vision pixel formats
@@ -51,7 +54,7 @@ Logic Flow:
    - If no metadata date found, uses file mtime BUT only if year matches folder path
    - Preserves Apple QuickTime metadata (make, model, software) if present
 
-6. Results are collected in a list of dictionaries with:
+6. Results are collected as one row tuple per file, in REPORT_COLUMNS order, with:
    - file: absolute file path
    - action: 'skip', 'move', or 'convert'
    - reason: detailed explanation (e.g., 'convert: video codec+HDR to SDR+container')
@@ -62,7 +65,7 @@ Logic Flow:
    - audio_codec_needed: 1 if audio needs re-encoding, 0 if can copy
 
 7. Results are exported to:
-   - Console output (pandas DataFrame with all columns visible)
+   - Console output (number of files per action)
    - CSV file with '@' as column separator for use by process_video_files.py
 
 Output Actions:
@@ -74,7 +77,8 @@ Output Actions:
 Conversion Reasons:
 ------------------
 The 'reason' field for 'convert' actions indicates which streams need conversion:
-- 'convert: video codec' - Video is not hvc1 HEVC
+- 'convert: video codec' - Video is not hvc1 HEVC, and not 8-bit SDR HEVC tagged hev1
+- 'convert: video tag' - Video is 8-bit SDR HEVC tagged hev1, remuxed as hvc1 without re-encoding
 - 'convert: HDR to SDR' - Video is HDR and needs SDR conversion
 - 'convert: audio codec' - Audio is not AAC
 - 'convert: container' - Container is not MOV
@@ -116,10 +120,11 @@ Scenario 5 - Old video with wrong file date:
 
 import os
 import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-import pandas as pd
 import json
-from src.utils import should_skip_by_partial_match, extract_year_from_path
+from src.utils import should_skip_by_partial_match, extract_year_from_path, walk_entries, write_csv
 
 
 ### CONFIGURATION ###
@@ -139,34 +144,65 @@ OUTPUT_CSV_FILE_NAME = "icloud_video_report.csv"
 CSV_SEPARATOR=";"
 # Minimum allowed year for video creation_time
 MIN_YEAR = 2000
+# Print every folder that is crawled
+VERBOSE = False
 
-# Pandas display settings
-pd.set_option('display.max_columns', None)
-pd.set_option('display.width', None)
-pd.set_option('display.max_colwidth', None)
 
+# Lowercased ffprobe tag keys holding the creation time, and the Apple QuickTime tags to preserve
+CREATION_TIME_KEYS = frozenset(('creation_time', 'com.apple.quicktime.creationdate'))
+APPLE_METADATA_KEYS = frozenset(('com.apple.quicktime.make', 'com.apple.quicktime.model', 'com.apple.quicktime.software'))
+
+# Only ask ffprobe for the fields the evaluation uses instead of every stream and format field.
+# Tag names are matched case-insensitively by ffprobe, creation times can sit on the container or on a stream.
+FFPROBE_TAGS = ','.join(sorted(CREATION_TIME_KEYS | APPLE_METADATA_KEYS))
+FFPROBE_ENTRIES = (f'format_tags={FFPROBE_TAGS}'
+                   ':stream=codec_type,codec_name,codec_tag_string,pix_fmt,color_transfer,color_primaries,channels'
+                   f':stream_tags={FFPROBE_TAGS}')
 
 def get_video_stream_info(file_path):
     cmd = [FFMPEG_BINARY_PATH.replace('ffmpeg.exe', 'ffprobe.exe'),
-           '-v', 'quiet', '-print_format', 'json', '-show_streams', '-show_format', file_path]
+           '-v', 'quiet', '-print_format', 'json', '-show_entries', FFPROBE_ENTRIES, file_path]
     result = subprocess.run(cmd, capture_output=True, text=True)
     if result.returncode != 0:
         return None
     return json.loads(result.stdout)
 
-def get_creation_time_from_metadata(metadata):
-    """Extract creation time from video metadata only (no fallback to file mtime)"""
+# Top-level atoms a QuickTime / ISO media file can start with. Older QuickTime files often start with
+# 'wide' or 'mdat' instead of 'ftyp', and ftyp brands vary too much per camera vendor to whitelist them.
+MP4_LEADING_ATOMS = (b'ftyp', b'moov', b'mdat', b'wide', b'free', b'skip', b'pnot', b'uuid')
+# EBML magic number every Matroska file starts with
+MKV_MAGIC = b'\x1a\x45\xdf\xa3'
+
+def quick_container_check(file_path, ext):
+    """Sniff the first bytes of the file so obviously broken files don't cost an ffprobe process"""
+    try:
+        with open(file_path, 'rb') as f:
+            header = f.read(8)
+    except OSError:
+        return False
+    if ext == 'mkv':
+        return header[:4] == MKV_MAGIC
+    if ext in ('mp4', 'mov'):
+        return header[4:8] in MP4_LEADING_ATOMS
+    return True
+
+def parse_metadata(metadata):
+    """Extract the creation time (no fallback to file mtime) and Apple QuickTime tags in a single pass over all tags"""
+    creation_time = None
+    apple_metadata = {}
     for section in ['format', 'streams']:
         if section in metadata:
             items = metadata[section] if isinstance(metadata[section], list) else [metadata[section]]
             for item in items:
-                tags = item.get('tags', {})
-                for k, v in tags.items():
-                    if k.lower() == 'creation_time':
-                        return v
-                    if k.lower() == 'com.apple.quicktime.creationdate':
-                        return v
-    return None
+                for k, v in item.get('tags', {}).items():
+                    k_low = k.lower()
+                    if k_low in CREATION_TIME_KEYS:
+                        # The first creation time found wins
+                        if creation_time is None:
+                            creation_time = v
+                    elif k_low in APPLE_METADATA_KEYS:
+                        apple_metadata[k] = v
+    return creation_time, apple_metadata or None
 
 def normalize_datetime_to_utc(dt_string):
     """Parse various datetime formats and convert to UTC ISO format with Z suffix"""
@@ -186,183 +222,150 @@ def normalize_datetime_to_utc(dt_string):
         print(f"Warning: Could not parse datetime '{dt_string}': {e}")
         return dt_string  # Return original if parsing fails
 
-def get_file_mtime_as_iso(file_path):
-    """Get file modification time as ISO 8601 string in UTC"""
-    if file_path and os.path.exists(file_path):
-        mod_time = os.path.getmtime(file_path)
-        dt = datetime.fromtimestamp(mod_time, timezone.utc)
-        return dt.strftime('%Y-%m-%dT%H:%M:%S.000Z')
-    return None
-
-def extract_apple_metadata(metadata):
-    # Extract Apple QuickTime metadata if present
-    apple_keys = [
-        'com.apple.quicktime.make',
-        'com.apple.quicktime.model',
-        'com.apple.quicktime.software',
-    ]
-    found = {}
-    for section in ['format', 'streams']:
-        if section in metadata:
-            items = metadata[section] if isinstance(metadata[section], list) else [metadata[section]]
-            for item in items:
-                tags = item.get('tags', {})
-                for k, v in tags.items():
-                    if k.lower() in apple_keys:
-                        found[k] = v
-    return found if found else None
+def get_mtime_as_iso(mod_time):
+    """Format a file modification time (epoch seconds) as ISO 8601 string in UTC"""
+    dt = datetime.fromtimestamp(mod_time, timezone.utc)
+    return dt.strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+# Explicit HDR transfer functions, and the wide color gamuts a 10-bit+ stream needs to count as HDR
+HDR_TRANSFERS = frozenset(('smpte2084', 'arib-std-b67'))
+HDR_PRIMARIES = frozenset(('bt2020', 'bt2020nc'))
 
 def is_hdr_stream(stream):
     # HDR is opt-in and explicitly signalled.
     trc = (stream.get('color_transfer')
            or stream.get('color_trc')
            or '').lower()
-    primaries = (stream.get('color_primaries') or '').lower()
-    pix_fmt = (stream.get('pix_fmt') or '').lower()
-
-    # Explicit HDR transfer functions
-    if trc in ('smpte2084', 'arib-std-b67'):
+    if trc in HDR_TRANSFERS:
         return True
 
+    pix_fmt = (stream.get('pix_fmt') or '').lower()
     # Dolby Vision sometimes signals this way
     if 'dovi' in pix_fmt:
         return True
 
-    # 10-bit or higher is REQUIRED for HDR
-    if any(x in pix_fmt for x in ('10', '12', '16')):
-        # Only consider HDR if wide gamut is present
-        if primaries in ('bt2020', 'bt2020nc'):
-            return True
+    # 10-bit or higher is REQUIRED for HDR, and only counts with a wide gamut
+    return (('10' in pix_fmt or '12' in pix_fmt or '16' in pix_fmt)
+            and (stream.get('color_primaries') or '').lower() in HDR_PRIMARIES)
 
-    return False
 
+# Column order of the CSV report, evaluate_file returns its row as a tuple in this order
+REPORT_COLUMNS = ['file', 'action', 'reason', 'creation_time', 'apple_metadata',
+                  'audio_channels', 'video_codec_needed', 'audio_codec_needed']
 
-def crawl_and_evaluate(root_folder_path, video_extensions, skiplist):
-    results = []
-    for folder_path, _, file_names in os.walk(root_folder_path):
-        print(f"Entering folder: {folder_path}")  # Progress print
-        for file_name in file_names:
-            file_path = os.path.abspath(os.path.join(folder_path, file_name))
-            entry = {'file': file_path}
-            results.append(entry)
-
-            ext = os.path.splitext(file_name)[1][1:].lower()
-            if ext not in video_extensions:
-                entry['action'] = 'skip'
-                entry['reason'] = 'wrong extension'
-                continue
-
-            if should_skip_by_partial_match(file_path, skiplist):
-                entry['action'] = 'skip'
-                entry['reason'] = 'skiplist match'
-                continue
-
-            info = get_video_stream_info(file_path)
-            if not info:
-                entry['action'] = 'skip'
-                entry['reason'] = 'ffprobe failed'
-                continue
-
-            # Get apple metadata early so it's always defined
-            apple_metadata = extract_apple_metadata(info)
-            creation_time = get_creation_time_from_metadata(info)
-            if not creation_time:
-                path_year = extract_year_from_path(file_path)
-                if path_year:
-                    mod_time = os.path.getmtime(file_path)
-                    mod_year = datetime.fromtimestamp(mod_time).year
-                    if str(mod_year) == path_year:
-                        creation_time = get_file_mtime_as_iso(file_path)
-                    else:
-                        entry['action'] = 'skip'
-                        entry['reason'] = 'no metadata creation time and and file modified time mismatch'
-                        continue
-                else:
-                    entry['action'] = 'skip'
-                    entry['reason'] = 'no metadata creation time and no year in path'
-                    continue
-
-            # Normalize the datetime to UTC format (handles both metadata and mtime)
-            creation_time = normalize_datetime_to_utc(creation_time)
-
-            # Skip if the creation time is way too old
-            year_str = creation_time[:4] if creation_time and len(creation_time) >= 4 else None
-            if year_str and year_str.isdigit() and int(year_str) < MIN_YEAR:
-                entry['action'] = 'skip'
-                entry['reason'] = f'creation_time before {MIN_YEAR}'
-                continue
-
-            # Determine if re-encode is needed, and for which parts exactly
-            video_codec_needed = True
-            audio_codec_needed = True
-            container_needed = ext != 'mov'
-            audio_channels = 2
-            video_reason = None
-            audio_reason = None
-            for stream in info.get('streams', []):
-                if stream.get('codec_type') == 'video':
-                    # Check codec/tag
-                    is_hvc1 = stream.get('codec_name') == 'hevc' and stream.get('codec_tag_string', '').lower() == 'hvc1'
-                    if is_hvc1:
-                        video_codec_needed = False
-                    else:
-                        video_codec_needed = True
-                        video_reason = 'video codec'
-                if stream.get('codec_type') == 'audio':
-                    if stream.get('codec_name') == 'aac':
-                        audio_codec_needed = False
-                    else:
-                        audio_reason = 'audio codec'
-                    audio_channels = int(stream.get('channels', 2))
-            if not container_needed:
-                container_reason = None
+def skip_row(file_path, reason):
+    return file_path, 'skip', reason, None, None, None, None, None
+
+
+def evaluate_file(file_entry, folder_skipped, video_extensions, skiplist):
+    file_name = file_entry.name
+    file_path = os.path.abspath(file_entry.path)
+
+    ext = os.path.splitext(file_name)[1][1:].lower()
+    if ext not in video_extensions:
+        return skip_row(file_path, 'wrong extension')
+
+    # Keywords can't span a path separator, so a file matches if its folder or its own name does
+    if folder_skipped or should_skip_by_partial_match(file_name, skiplist):
+        return skip_row(file_path, 'skiplist match')
+
+    if not quick_container_check(file_path, ext):
+        return skip_row(file_path, 'container header unrecognized')
+
+    info = get_video_stream_info(file_path)
+    if not info:
+        return skip_row(file_path, 'ffprobe failed')
+
+    creation_time, apple_metadata = parse_metadata(info)
+    if not creation_time:
+        path_year = extract_year_from_path(file_path)
+        if path_year:
+            mod_time = file_entry.stat().st_mtime
+            mod_year = datetime.fromtimestamp(mod_time).year
+            if str(mod_year) == path_year:
+                creation_time = get_mtime_as_iso(mod_time)
+            else:
+                return skip_row(file_path, 'no metadata creation time and and file modified time mismatch')
+        else:
+            return skip_row(file_path, 'no metadata creation time and no year in path')
+
+    # Normalize the datetime to UTC format (handles both metadata and mtime)
+    creation_time = normalize_datetime_to_utc(creation_time)
+
+    # Skip if the creation time is way too old
+    year_str = creation_time[:4] if creation_time and len(creation_time) >= 4 else None
+    if year_str and year_str.isdigit() and int(year_str) < MIN_YEAR:
+        return skip_row(file_path, f'creation_time before {MIN_YEAR}')
+
+    # Determine if re-encode is needed, and for which parts exactly
+    video_codec_needed = True
+    video_tag_needed = False
+    audio_codec_needed = True
+    container_needed = ext != 'mov'
+    audio_channels = 2
+    video_reason = None
+    audio_reason = None
+    for stream in info.get('streams', []):
+        if stream.get('codec_type') == 'video':
+            # Check codec/tag
+            codec_tag = stream.get('codec_tag_string', '').lower()
+            is_hevc = stream.get('codec_name') == 'hevc'
+            if is_hevc and codec_tag == 'hvc1':
+                video_codec_needed = False
+            elif (is_hevc and codec_tag == 'hev1' and stream.get('pix_fmt') == 'yuv420p'
+                  and not is_hdr_stream(stream)):
+                # 8-bit SDR HEVC tagged hev1 only needs a remux with the hvc1 tag, not a re-encode
+                video_codec_needed = False
+                video_tag_needed = True
+            else:
+                video_codec_needed = True
+                video_reason = 'video codec'
+        if stream.get('codec_type') == 'audio':
+            if stream.get('codec_name') == 'aac':
+                audio_codec_needed = False
             else:
-                container_reason = 'container'
-
-            # If everything is compatible (video, audio, MOV), just mark as move
-            if not video_codec_needed and not audio_codec_needed and not container_needed:
-                entry['action'] = 'move'
-                entry['reason'] = 'fully compatible already'
-                entry['creation_time'] = creation_time
-                entry['apple_metadata'] = json.dumps(apple_metadata) if apple_metadata else ''
-                entry['audio_channels'] = audio_channels
-                entry['video_codec_needed'] = 0
-                entry['audio_codec_needed'] = 0
-                continue
-
-            # Build reason for converting string
-            reasons = []
-            if video_codec_needed:
-                if video_reason:
-                    reasons.append(video_reason)
-            if audio_codec_needed:
-                if audio_reason:
-                    reasons.append(audio_reason)
-            if container_needed:
-                if container_reason:
-                    reasons.append(container_reason)
-            reason_str = 'convert: ' + '+'.join(reasons) if reasons else 'convert'
-
-
-            # Get apple metadata
-            apple_metadata = extract_apple_metadata(info)
-            entry['action'] = 'convert'
-            entry['reason'] = reason_str
-            entry['creation_time'] = creation_time
-            entry['apple_metadata'] = json.dumps(apple_metadata) if apple_metadata else ''
-            entry['audio_channels'] = audio_channels
-            entry['video_codec_needed'] = 1 if video_codec_needed else 0
-            entry['audio_codec_needed'] = 1 if audio_codec_needed else 0
-    return results
+                audio_reason = 'audio codec'
+            audio_channels = int(stream.get('channels', 2))
+
+    # If everything is compatible (video, audio, MOV), just mark as move
+    if not video_codec_needed and not video_tag_needed and not audio_codec_needed and not container_needed:
+        return (file_path, 'move', 'fully compatible already', creation_time,
+                json.dumps(apple_metadata) if apple_metadata else '', audio_channels, 0, 0)
+
+    # Build reason for converting string
+    reasons = '+'.join(reason for needed, reason in ((video_codec_needed, video_reason),
+                                                     (video_tag_needed and not video_codec_needed, 'video tag'),
+                                                     (audio_codec_needed, audio_reason),
+                                                     (container_needed, 'container'))
+                       if needed and reason)
+    reason_str = f'convert: {reasons}' if reasons else 'convert'
+
+    return (file_path, 'convert', reason_str, creation_time,
+            json.dumps(apple_metadata) if apple_metadata else '', audio_channels,
+            1 if video_codec_needed else 0, 1 if audio_codec_needed else 0)
+
+
+def crawl_and_evaluate(root_folder_path, video_extensions, skiplist):
+    file_entries = []
+    for folder_path, _, folder_file_entries in walk_entries(root_folder_path):
+        if VERBOSE:
+            print(f"Entering folder: {folder_path}")  # Progress print
+        # Match the skiplist once per folder rather than against every full file path
+        folder_skipped = should_skip_by_partial_match(os.path.abspath(folder_path), skiplist)
+        file_entries.extend((file_entry, folder_skipped) for file_entry in folder_file_entries)
+    # Nearly all time is spent waiting on ffprobe subprocesses, so threads are enough to run them in parallel
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        return list(executor.map(lambda args: evaluate_file(*args, video_extensions, skiplist), file_entries))
 
 
 if __name__ == "__main__":
     video_extensions = [e.lower() for e in ONLY_HANDLE_THESE_VIDEO_EXTENSIONS]
-    results = crawl_and_evaluate(ROOT_VIDEO_FOLDER, video_extensions, SKIPLIST_PARTIAL_MATCH)
-    df = pd.DataFrame(results)
-    print(df)
+    rows = crawl_and_evaluate(ROOT_VIDEO_FOLDER, video_extensions, SKIPLIST_PARTIAL_MATCH)
+    action_index = REPORT_COLUMNS.index('action')
+    for action, count in Counter(row[action_index] for row in rows).items():
+        print(f"{action}: {count} files")
 
     # Ensure output folder exists
     os.makedirs(OUTPUT_CSV_FOLDER_PATH, exist_ok=True)
     OUTPUT_CSV_FILE_PATH = os.path.join(OUTPUT_CSV_FOLDER_PATH, OUTPUT_CSV_FILE_NAME)
-    df.to_csv(OUTPUT_CSV_FILE_PATH, sep=CSV_SEPARATOR, index=False)
+    write_csv(OUTPUT_CSV_FILE_PATH, REPORT_COLUMNS, rows, CSV_SEPARATOR)
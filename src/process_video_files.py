@@ -5,7 +5,7 @@ This module processes video files for iCloud re-ingestion based on a CSV report
 
 - Reads a CSV report with video file actions (move, convert, skip) and associated metadata.
 - For 'move' actions, copies compatible video files to a processed folder, preserving metadata and timestamps.
-- For 'convert' actions, re-encodes video files to the required format (MOV container, HVC1 video, AAC audio) using ffmpeg, and sets Apple QuickTime metadata using exiftool if available.
+- For 'convert' actions, re-encodes video files to the required format (MOV container, HVC1 video, AAC audio) using ffmpeg, setting the creation time and Apple QuickTime metadata in the same pass (optionally again with exiftool).
 - Handles creation and modification times, and preserves Apple-specific metadata where possible.
 - Skips files that are already processed or marked as 'skip' in the report.
 - Writes a processed CSV report with the results and any errors encountered.
@@ -15,38 +15,96 @@ Configuration options at the top of the script control input/output paths, ffmpe
 Typical usage: Run this script after evaluating video files to perform the actual moves/conversions and generate a processed report for further archiving or review.
 """
 
+import csv
 import os
 import pandas as pd
 import json
-import shutil
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
 import subprocess
 import zoneinfo
+from src.utils import fast_copy, sha256_of_file
+
+try:
+    import pyarrow
+    import pyarrow.csv
+except ImportError:  # pyarrow is optional, CSV reports are read with pandas' own C parser without it
+    pyarrow = None
 
 # Define local timezone (CET/CEST - Europe/Brussels or Europe/Amsterdam)
 LOCAL_TIMEZONE = zoneinfo.ZoneInfo('Europe/Brussels')
 
 FFMPEG_BINARY_PATH = r"C:\Program Files\ffmpeg\5.1\bin\ffmpeg.exe"
 EXIFTOOL_BINARY_PATH = r"C:\Program Files\exiftool\exiftool.exe"  # You may need to install exiftool
+# ffmpeg writes the creation time and Apple tags while converting, set to True to also rewrite them with exiftool
+USE_EXIFTOOL = False
 INPUT_CSV_FOLDER_PATH = "report/2024"
 INPUT_CSV_FILE_NAME = "icloud_video_report.csv"
 PROCESSED_VIDEO_FOLDER_PATH = r"data\processed_videos\2024"
 OUTPUT_CSV_FOLDER_PATH = "report/2024"
 OUTPUT_CSV_FILE_NAME = "icloud_video_report_processed.csv"
 CSV_SEPARATOR=";"
+# Add a sha256 column to the processed report with the checksum of every file that was written
+COMPUTE_SHA256 = False
+# Threads each ffmpeg encode may use, x265 rarely scales well past a handful of threads on short clips
+FFMPEG_THREADS = 4
+# Number of files processed at the same time, so that MAX_WORKERS x FFMPEG_THREADS is about the number of cores
+MAX_WORKERS = max(1, (os.cpu_count() or 1) // FFMPEG_THREADS)
+# Number of files copied at the same time for 'move' actions, these only wait on the disk
+COPY_WORKERS = 8
+# HEVC encoder for re-encoded video: 'cpu' (libx265), a GPU encoder 'nvenc' (NVIDIA), 'qsv' (Intel), 'amf' (AMD),
+# or 'auto' to use the first GPU encoder that works on this machine and fall back to the CPU
+VIDEO_ENCODER = 'cpu'
+
+# Look for the binaries once instead of on every conversion
+HAS_FFMPEG = os.path.isfile(FFMPEG_BINARY_PATH) and os.access(FFMPEG_BINARY_PATH, os.X_OK)
+HAS_EXIFTOOL = os.path.isfile(EXIFTOOL_BINARY_PATH) and os.access(EXIFTOOL_BINARY_PATH, os.X_OK)
+
+# ffmpeg encoder per VIDEO_ENCODER value, with its quality settings. All of them get a 60 frame keyframe interval.
+VIDEO_ENCODER_ARGS = {
+    'cpu': ['-c:v', 'libx265', '-pix_fmt', 'yuv420p',
+            '-x265-params', f'keyint=60:min-keyint=60:scenecut=0:bframes=4:open-gop=0:repeat-headers=1:pools={FFMPEG_THREADS}'],
+    'nvenc': ['-c:v', 'hevc_nvenc', '-pix_fmt', 'yuv420p', '-preset', 'p5', '-rc', 'vbr', '-cq', '22', '-b:v', '0',
+              '-g', '60', '-bf', '4', '-b_ref_mode', 'middle'],
+    'qsv': ['-c:v', 'hevc_qsv', '-pix_fmt', 'nv12', '-preset', 'slow', '-global_quality', '22', '-g', '60'],
+    'amf': ['-c:v', 'hevc_amf', '-pix_fmt', 'yuv420p', '-quality', 'quality', '-rc', 'cqp',
+            '-qp_i', '22', '-qp_p', '22', '-g', '60'],
+}
+
+
+def video_encode_args(encoder):
+    # ffmpeg video arguments for a re-encode: the encoder settings plus the hvc1 Main@4.0 30 fps output Apple wants
+    return [*VIDEO_ENCODER_ARGS[encoder], '-tag:v', 'hvc1', '-profile:v', 'main', '-level:v', '4.0', '-r', '30']
+
 
-def convert_video(src, dst, creation_time, video_codec_needed, audio_codec_needed, audio_channels, apple_metadata=None):
+@lru_cache(maxsize=None)
+def get_video_encoder():
+    """Resolve VIDEO_ENCODER to one of the VIDEO_ENCODER_ARGS keys, 'auto' probes ffmpeg once"""
+    if VIDEO_ENCODER != 'auto':
+        return VIDEO_ENCODER
+    listed = subprocess.run([FFMPEG_BINARY_PATH, '-hide_banner', '-encoders'], capture_output=True, text=True).stdout
+    for encoder in ('nvenc', 'qsv', 'amf'):
+        codec = VIDEO_ENCODER_ARGS[encoder][1]
+        if codec not in listed:
+            continue
+        # ffmpeg builds list GPU encoders whether or not the hardware is there, so try a tiny encode with the
+        # same options a real conversion uses
+        test_cmd = [FFMPEG_BINARY_PATH, '-hide_banner', '-v', 'error', '-f', 'lavfi', '-i', 'color=size=256x256:duration=0.1',
+                    *video_encode_args(encoder), '-f', 'null', '-']
+        if subprocess.run(test_cmd, capture_output=True).returncode == 0:
+            return encoder
+    return 'cpu'
+
+
+def convert_video(src, dst, creation_time, creation_epoch, video_codec_needed, video_tag_needed, audio_codec_needed,
+                  audio_channels, apple_metadata=None):
     cmd = [FFMPEG_BINARY_PATH, '-y', '-i', src]
     if video_codec_needed:
-        cmd += [
-            '-c:v', 'libx265',
-            '-tag:v', 'hvc1',
-            '-profile:v', 'main',
-            '-level:v', '4.0',
-            '-pix_fmt', 'yuv420p',
-            '-r', '30',
-            '-x265-params', 'keyint=60:min-keyint=60:scenecut=0:bframes=4:open-gop=0:repeat-headers=1',
-        ]
+        cmd += video_encode_args(get_video_encoder())
+    elif video_tag_needed:
+        # HEVC tagged hev1 only needs the hvc1 tag to play on Apple devices
+        cmd += ['-c:v', 'copy', '-tag:v', 'hvc1']
     else:
         cmd += ['-c:v', 'copy']
     if audio_codec_needed:
@@ -58,18 +116,34 @@ def convert_video(src, dst, creation_time, video_codec_needed, audio_codec_neede
     else:
         cmd += ['-c:a', 'copy']
 
-    # Set basic creation_time metadata
+    # Apple QuickTime tags to carry over, keyed on make, model and software
+    apple_tags = {}
+    if apple_metadata:
+        # Lowercase the keys once instead of once per tag looked up
+        lowered = {k.lower(): v for k, v in apple_metadata.items()}
+        for name in ('make', 'model', 'software'):
+            value = next((v for k, v in lowered.items() if name in k), None)
+            if value:
+                apple_tags[name] = value
+
+    # Set the metadata while muxing, so the file doesn't need a second rewrite afterwards.
+    # creation_time sets the movie, track and media creation/modification dates,
+    # use_metadata_tags makes the mov muxer write the com.apple.quicktime.* keys as iPhones do.
+    movflags = '+write_colr+faststart'
     if creation_time:
         cmd += ['-metadata', f'creation_time={creation_time}']
+    if apple_tags:
+        for name, value in apple_tags.items():
+            cmd += ['-metadata', f'com.apple.quicktime.{name}={value}']
+        movflags += '+use_metadata_tags'
 
-    cmd += ['-movflags', '+write_colr+faststart', dst]
+    cmd += ['-threads', str(FFMPEG_THREADS), '-movflags', movflags, dst]
 
     print(f"Converting: {src}")
     subprocess.run(cmd, check=True)
 
-    # After ffmpeg conversion, use exiftool to set Apple-specific QuickTime tags
-    # This is more reliable than ffmpeg's -metadata for Apple tags
-    if creation_time or apple_metadata:
+    # Optionally rewrite the Apple-specific QuickTime tags with exiftool as well
+    if USE_EXIFTOOL and (creation_time or apple_tags):
         exiftool_cmd = [EXIFTOOL_BINARY_PATH, '-overwrite_original']
 
         if creation_time:
@@ -81,117 +155,226 @@ def convert_video(src, dst, creation_time, video_codec_needed, audio_codec_neede
             exiftool_cmd.append(f'-QuickTime:MediaCreateDate={creation_time}')
             exiftool_cmd.append(f'-QuickTime:MediaModifyDate={creation_time}')
 
-        if apple_metadata:
-            if 'com.apple.quicktime.make' in apple_metadata or any('make' in k.lower() for k in apple_metadata.keys()):
-                make = next((v for k, v in apple_metadata.items() if 'make' in k.lower()), None)
-                if make:
-                    exiftool_cmd.append(f'-QuickTime:Make={make}')
-
-            if 'com.apple.quicktime.model' in apple_metadata or any('model' in k.lower() for k in apple_metadata.keys()):
-                model = next((v for k, v in apple_metadata.items() if 'model' in k.lower()), None)
-                if model:
-                    exiftool_cmd.append(f'-QuickTime:Model={model}')
-
-            if 'com.apple.quicktime.software' in apple_metadata or any('software' in k.lower() for k in apple_metadata.keys()):
-                software = next((v for k, v in apple_metadata.items() if 'software' in k.lower()), None)
-                if software:
-                    exiftool_cmd.append(f'-QuickTime:Software={software}')
+        for name, value in apple_tags.items():
+            exiftool_cmd.append(f'-QuickTime:{name.capitalize()}={value}')
 
         exiftool_cmd.append(dst)
 
-        # Check if exiftool exists before trying to use it
-        if os.path.exists(EXIFTOOL_BINARY_PATH):
+        if HAS_EXIFTOOL:
             print(f"Setting metadata with exiftool...")
             subprocess.run(exiftool_cmd, check=False)  # Don't fail if exiftool has issues
         else:
             print(f"Warning: exiftool not found at {EXIFTOOL_BINARY_PATH}, skipping Apple metadata")
 
-    # Set file mtime
-    if creation_time:
+    # Set file mtime, creation_epoch is parsed once for all rows in process_actions_from_csv
+    if creation_epoch is not None:
+        set_mtime(dst, creation_epoch)
+
+
+def set_mtime(path, mod_time):
+    # Skip the write when the file already has this mtime, e.g. copied along from the source by fast_copy
+    try:
+        if abs(os.stat(path).st_mtime - mod_time) > 1.0:
+            os.utime(path, (mod_time, mod_time))
+    except Exception as e:
+        print(f"Warning: Could not set mtime for {path}: {e}")
+
+
+def process_row(task):
+    """Move or convert the video of one report row, returns (report row index, processing status, sha256 or None)"""
+    out_path = task['out_path']
+    mod_time = task['mod_time']
+    try:
+        if task['action'] == 'move':
+            fast_copy(task['file'], out_path)
+            # Set file mtime to the creation time
+            if mod_time is not None:
+                set_mtime(out_path, mod_time)
+        else:
+            apple_metadata = json.loads(task['apple_metadata']) if task['apple_metadata'] is not None else None
+            convert_video(task['file'], out_path, task['creation_time'], mod_time, task['video_codec_needed'],
+                          task['video_tag_needed'], task['audio_codec_needed'], task['audio_channels'], apple_metadata)
+        sha256 = sha256_of_file(out_path) if COMPUTE_SHA256 else None
+        return task['idx'], 'SUCCESS', sha256
+    except Exception as e:
+        print(f"Error processing {task['file']}: {e}")
+        return task['idx'], f'ERROR: {e}', None
+
+
+# Report columns holding small integers, every other column is read as text
+NUMERIC_REPORT_COLUMNS = ('audio_channels', 'video_codec_needed', 'audio_codec_needed')
+
+
+def read_report(csv_path):
+    """Read the evaluation report, all columns as text except the numeric ones when pyarrow is available"""
+    if pyarrow is not None:
+        with open(csv_path, newline='', encoding='utf-8') as f:
+            header = next(csv.reader(f, delimiter=CSV_SEPARATOR))
+        # Give every column its type up front, so pyarrow parses the numbers in the same pass and doesn't
+        # guess types (e.g. turn creation_time into timestamps) for the text columns
+        column_types = {column: pyarrow.int8() if column in NUMERIC_REPORT_COLUMNS else pyarrow.string()
+                        for column in header}
+        try:
+            table = pyarrow.csv.read_csv(
+                csv_path,
+                parse_options=pyarrow.csv.ParseOptions(delimiter=CSV_SEPARATOR),
+                convert_options=pyarrow.csv.ConvertOptions(column_types=column_types, strings_can_be_null=True))
+        except pyarrow.ArrowInvalid as e:
+            # e.g. a hand edited numeric cell that isn't an integer, the C parser reads it as text
+            print(f"Warning: Could not read {csv_path} with pyarrow, falling back to pandas: {e}")
+        else:
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+    return pd.read_csv(csv_path, sep=CSV_SEPARATOR, dtype=str)
+
+
+def write_report(df, csv_path):
+    """Write the processed report, with pyarrow's C++ CSV writer when available"""
+    if pyarrow is not None:
+        try:
+            table = pyarrow.Table.from_pandas(df, preserve_index=False)
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError) as e:
+            # e.g. a column mixing text and numbers, pandas writes anything
+            print(f"Warning: Could not write {csv_path} with pyarrow, falling back to pandas: {e}")
+        else:
+            # Text values get quoted, still read back the same by pandas in replace_archived_video_files.py
+            pyarrow.csv.write_csv(table, csv_path, write_options=pyarrow.csv.WriteOptions(delimiter=CSV_SEPARATOR))
+            return
+    df.to_csv(csv_path, sep=CSV_SEPARATOR, index=False)
+
+
+def numeric_column(df, column, default):
+    """Report column as numbers, empty or unparseable cells and a missing column read as default"""
+    if column not in df.columns:
+        return pd.Series(default, index=df.index)
+    return pd.to_numeric(df[column], errors='coerce').fillna(default)
+
+
+def parse_creation_epoch(creation_time):
+    """Epoch seconds of a creation_time in any ISO 8601 form, naive times are local time, None if it can't be read"""
+    try:
+        dt = datetime.fromisoformat(creation_time.replace('Z', '+00:00'))
+    except ValueError:
         try:
-            dt = None
-            try:
-                dt = datetime.fromisoformat(creation_time.replace('Z', '+00:00'))
-            except Exception:
-                dt = datetime.strptime(creation_time[:19], '%Y-%m-%dT%H:%M:%S')
-            mod_time = dt.timestamp()
-            os.utime(dst, (mod_time, mod_time))
-        except Exception:
-            pass
+            dt = datetime.strptime(creation_time[:19], '%Y-%m-%dT%H:%M:%S')
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=LOCAL_TIMEZONE)
+    return dt.timestamp()
+
+
+def text_column(df, column):
+    """Report column as Python strings, empty cells and a missing column read as None"""
+    if column not in df.columns:
+        return pd.Series(None, index=df.index, dtype=object)
+    values = df[column].astype(object)
+    return values.where(values.notna(), None)
 
 
 def process_actions_from_csv(csv_path):
     # ensure output folder exists
     os.makedirs(PROCESSED_VIDEO_FOLDER_PATH, exist_ok=True)
 
-    df = pd.read_csv(csv_path, sep=CSV_SEPARATOR, dtype=str)
-    df['derived_file'] = None  # Add new column for output path
-    df['processing_status'] = ''  # Add column to track processing errors
+    df = read_report(csv_path)
+    # New columns for the output path and to track processing errors
+    df['derived_file'] = None
+    df['processing_status'] = ''
+    if COMPUTE_SHA256:
+        df['sha256'] = None
 
-    for idx, row in df.iterrows():
-        action = row.get('action')
-        if action == 'skip':
-            continue
+    # Only move and convert rows need work, skip rows are kept in the report as they are
+    todo = df[(df['action'] != 'skip').fillna(True)]
+    actions = text_column(todo, 'action')
+    files = text_column(todo, 'file')
 
-        try:
-            creation_time = row.get('creation_time')
-            if 'apple_metadata' in row and pd.notna(row['apple_metadata']):
-                apple_metadata = json.loads(row['apple_metadata'])
-            else:
-                apple_metadata = None
-            val = row.get('audio_channels')
-            audio_channels = int(float(val)) if pd.notna(val) else 2
-            video_codec_needed = bool(int(float(row.get('video_codec_needed', '1'))))
-            audio_codec_needed = bool(int(float(row.get('audio_codec_needed', '1'))))
-
-            # Establish an output file path with a unique prefix from creation_time
-            prefix = "unknown_"
-            dt_local = None  # Store local datetime for use in mtime
-            if creation_time and pd.notna(creation_time):
-                try:
-                    # Parse UTC datetime format: 2018-09-28T19:02:21.000Z
-                    dt_utc = datetime.strptime(creation_time.replace('Z', ''), '%Y-%m-%dT%H:%M:%S.%f')
-                    # Make it timezone-aware (UTC)
-                    dt_utc = dt_utc.replace(tzinfo=timezone.utc)
-                    # Convert to local CET/CEST timezone
-                    dt_local = dt_utc.astimezone(LOCAL_TIMEZONE)
-                    # Use local time for filename prefix
-                    prefix = dt_local.strftime('%Y%m%d_%H%M%S-')
-                except Exception as e:
-                    print(f"Warning: Could not parse creation_time '{creation_time}': {e}")
-                    prefix = "unknown_"
-            file_path = row.get('file')
-            file_name = os.path.basename(file_path)
-            # For convert actions, always use .mov extension for output
-            if action == 'convert':
-                base_name, _ = os.path.splitext(file_name)
-                unique_file_name = f"{prefix}{base_name}.mov"
-            else:
-                unique_file_name = f"{prefix}{file_name}"
-            out_path = os.path.join(PROCESSED_VIDEO_FOLDER_PATH, unique_file_name)
-            df.at[idx, 'derived_file'] = out_path  # Store output path in new column
-
-            # Check if output file already exists with size > 0
-            if os.path.exists(out_path) and os.path.getsize(out_path) > 0:
-                df.at[idx, 'processing_status'] = 'SKIPPED: file already exists'
-                print(f"Skipping {file_path}: output file already exists at {out_path}")
-                continue
-
-            if action == 'move':
-                shutil.copy2(file_path, out_path)
-                # Set file mtime to local time (not UTC)
-                if dt_local:
-                    try:
-                        mod_time = dt_local.timestamp()
-                        os.utime(out_path, (mod_time, mod_time))
-                    except Exception as e:
-                        print(f"Warning: Could not set mtime for {out_path}: {e}")
-                df.at[idx, 'processing_status'] = 'SUCCESS'
-            elif action == 'convert':
-                convert_video(file_path, out_path, creation_time, video_codec_needed, audio_codec_needed, audio_channels, apple_metadata)
-                # Set file mtime to local time (not UTC) after conversion
-                if dt_local:
-                    try:
-                        mod_time = dt_local.timestamp()
-                        os.utime(out_path, (mod_time, mod_time))
+    # Parse the whole creation_time column at once, UTC datetime format: 2018-09-28T19:02:21.000Z,
+    # and convert it to local CET/CEST time, used for the filename prefix and the file mtime
+    creation_times = text_column(todo, 'creation_time')
+    local_times = pd.to_datetime(creation_times, format='%Y-%m-%dT%H:%M:%S.%fZ', utc=True, cache=True,
+                                 errors='coerce').dt.tz_convert(LOCAL_TIMEZONE)
+    unparsed = creation_times.notna() & local_times.isna()
+    # Bursts and live photos share a creation_time, so only format each distinct time once
+    codes, unique_local_times = pd.factorize(local_times)
+    unique_prefixes = unique_local_times.strftime('%Y%m%d_%H%M%S-').tolist()
+    prefixes = pd.Series([unique_prefixes[code] if code >= 0 else 'unknown_' for code in codes], index=todo.index)
+    # File mtimes as epoch seconds, None where there is no usable creation_time
+    mod_times = (local_times - pd.Timestamp(0, tz='UTC')).dt.total_seconds()
+    mod_times = mod_times.astype(object).where(mod_times.notna(), None)
+    # Hand edited values in another ISO 8601 form still set the mtime, they just get the 'unknown_' prefix
+    for idx, creation_time in creation_times[unparsed].items():
+        mod_times[idx] = parse_creation_epoch(creation_time)
+        if mod_times[idx] is None:
+            print(f"Warning: Could not parse creation_time '{creation_time}', the file mtime won't be set")
+        else:
+            print(f"Warning: creation_time '{creation_time}' is not in the report format, only used for the mtime")
+
+    # Output file name of every row: the creation time prefix and the original name, convert actions always
+    # get a .mov extension
+    file_names = files.map(os.path.basename, na_action='ignore')
+    is_convert = actions == 'convert'
+    file_names[is_convert] = file_names[is_convert].map(lambda name: os.path.splitext(name)[0] + '.mov',
+                                                        na_action='ignore')
+    unique_file_names = prefixes + file_names
+    out_paths = os.path.join(PROCESSED_VIDEO_FOLDER_PATH, '') + unique_file_names
+    df.loc[todo.index, 'derived_file'] = out_paths
+
+    # Sizes of the files already in the output folder, listed once instead of two stat calls per row
+    # (normcase so the lookup is case-insensitive on Windows, like os.path.exists)
+    with os.scandir(PROCESSED_VIDEO_FOLDER_PATH) as entries:
+        existing_sizes = {os.path.normcase(entry.name): entry.stat().st_size for entry in entries if entry.is_file()}
+    # Skip outputs that already exist with size > 0, or that an earlier row in the report already writes
+    exists = unique_file_names.map(os.path.normcase, na_action='ignore').map(existing_sizes).fillna(0) > 0
+    claimed = out_paths.where(~exists).duplicated() & out_paths.notna() & ~exists
+    skipped = exists | claimed
+    df.loc[skipped[skipped].index, 'processing_status'] = 'SKIPPED: file already exists'
+    for file_path, out_path in zip(files[skipped], out_paths[skipped]):
+        print(f"Skipping {file_path}: output file already exists at {out_path}")
+    missing_file = files.isna()
+    df.loc[missing_file[missing_file].index, 'processing_status'] = 'ERROR: no file in report'
+
+    # The remaining rows as one task per file, split by action so each goes to its own pool
+    tasks = pd.DataFrame({
+        'idx': todo.index, 'action': actions, 'file': files, 'out_path': out_paths, 'mod_time': mod_times,
+        'creation_time': creation_times, 'apple_metadata': text_column(todo, 'apple_metadata'),
+        'audio_channels': numeric_column(todo, 'audio_channels', 2).astype('int8'),
+        'video_codec_needed': numeric_column(todo, 'video_codec_needed', 1).astype(bool),
+        # Only rows the evaluation found tagged hev1 get retagged, a copied stream of another codec can't be hvc1
+        'video_tag_needed': text_column(todo, 'reason').fillna('').str.contains('video tag', regex=False),
+        'audio_codec_needed': numeric_column(todo, 'audio_codec_needed', 1).astype(bool),
+    })[~skipped & ~missing_file]
+    move_tasks = tasks[tasks['action'] == 'move'].to_dict('records')
+    convert_tasks = tasks[tasks['action'] == 'convert'].to_dict('records')
+
+    # Fail before processing anything rather than on every single conversion
+    if not HAS_FFMPEG and convert_tasks:
+        raise FileNotFoundError(f"ffmpeg not found: {FFMPEG_BINARY_PATH}")
+
+    # Pick the video encoder before the workers start, so they don't all probe ffmpeg at once
+    if any(task['video_codec_needed'] for task in convert_tasks):
+        print(f"Video encoder: {get_video_encoder()}")
+
+    # Copies only wait on the disk and ffmpeg runs in its own process, so threads are enough for both. Separate
+    # pools keep the moves from queueing behind the much slower conversions.
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as copy_executor, \
+            ThreadPoolExecutor(max_workers=MAX_WORKERS) as convert_executor:
+        moved = copy_executor.map(process_row, move_tasks)
+        converted = convert_executor.map(process_row, convert_tasks)
+        results = list(moved) + list(converted)
+
+    if results:
+        idxs, statuses, sha256s = (list(column) for column in zip(*results))
+        df.loc[idxs, 'processing_status'] = statuses
+        if COMPUTE_SHA256:
+            df.loc[idxs, 'sha256'] = sha256s
+    return df
+
+
+if __name__ == "__main__":
+    input_csv_path = os.path.join(INPUT_CSV_FOLDER_PATH, INPUT_CSV_FILE_NAME)
+    df = process_actions_from_csv(input_csv_path)
 
+    # Save the updated DataFrame
+    os.makedirs(OUTPUT_CSV_FOLDER_PATH, exist_ok=True)
+    output_csv_path = os.path.join(OUTPUT_CSV_FOLDER_PATH, OUTPUT_CSV_FILE_NAME)
+    write_report(df, output_csv_path)
+    print(f"Done. Results written to {output_csv_path}")
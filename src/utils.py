@@ -1,19 +1,116 @@
+import csv
+import hashlib
+import mmap
+import os
 import re
+import shutil
+from functools import lru_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows, fast_copy falls back to a regular copy
+    fcntl = None
+
+# ioctl request to share the source file's data blocks with the destination (Linux FICLONE)
+FICLONE = 0x40049409
+
+@lru_cache(maxsize=None)
+def compile_skiplist(keywords):
+    # A single alternation of the lowercased keywords scans the path once instead of once per keyword.
+    # Matched against the lowercased path rather than with re.IGNORECASE, which keeps re's fast literal search.
+    if not keywords:
+        return None
+    return re.compile('|'.join(re.escape(keyword.lower()) for keyword in keywords))
+
 
 def should_skip_by_partial_match(path, skiplist):
-    for keyword in skiplist:
-        if keyword.lower() in path.lower():
-            return True
-    return False
+    pattern = compile_skiplist(tuple(skiplist))
+    return pattern is not None and pattern.search(path.lower()) is not None
+
+
+# A path component starting with a 4-digit year starting with 20, e.g. "2018" or "2018-07-17 Summer Vacation"
+YEAR_IN_PATH_RE = re.compile(r'(?:^|[\\/])(20\d{2})')
 
 
 def extract_year_from_path(path):
-    # Split the path into components and look for a 4-digit year starting with 20
-    parts = re.split(r'[\\/]', path)
-    for part in parts:
-        match = re.match(r'(20\d{2})', part)
-        if match:
-            return match.group(1)
-    return None
+    # The first path component starting with a year, found in a single scan of the path
+    match = YEAR_IN_PATH_RE.search(path)
+    return match.group(1) if match else None
+
+
+def walk_entries(root_folder):
+    # Top-down walk like os.walk, but files come back as os.DirEntry objects so callers can reuse
+    # their cached stat() instead of paying an extra os.path.getsize / getmtime syscall per file.
+    # Like with os.walk, subfolders can be pruned by editing dirnames in place.
+    stack = [root_folder]
+    while stack:
+        folder_path = stack.pop()
+        try:
+            with os.scandir(folder_path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        dirnames = []
+        file_entries = []
+        symlinked_dirs = set()
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                dirnames.append(entry.name)
+                if entry.is_symlink():
+                    symlinked_dirs.add(entry.name)
+            else:
+                file_entries.append(entry)
+        yield folder_path, dirnames, file_entries
+        # Like os.walk, don't follow symlinked folders
+        for dirname in reversed(dirnames):
+            if dirname not in symlinked_dirs:
+                stack.append(os.path.join(folder_path, dirname))
+
+
+def write_csv(path, header, rows, separator):
+    # Stream rows straight to disk, no intermediate DataFrame copy of the whole report
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=separator)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def fast_copy(src, dst):
+    # Copy a file and its metadata like shutil.copy2. On copy-on-write filesystems (Btrfs, XFS, ...) the
+    # destination is cloned from the source instead of reading and writing every byte, otherwise the kernel
+    # copies the data with copy_file_range without passing it through Python.
+    if fcntl is None or not hasattr(os, 'copy_file_range'):
+        return shutil.copy2(src, dst)
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            except OSError:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        # Source ended early or the filesystem gave up, redo it with a regular copy
+                        # rather than leave a truncated file behind
+                        raise OSError(f"copy_file_range stopped with {remaining} bytes left")
+                    remaining -= copied
+    except OSError:
+        return shutil.copy2(src, dst)
+    shutil.copystat(src, dst)
+    return dst
 
 
+def sha256_of_file(path):
+    # Hash the file straight from the page cache through a memory map instead of copying it chunk by chunk
+    # into Python bytes objects. hashlib releases the GIL while hashing, so this runs in parallel on threads.
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return hashlib.sha256().hexdigest()  # an empty file can't be memory mapped
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise'):  # not available on Windows
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            return hashlib.sha256(mm).hexdigest()